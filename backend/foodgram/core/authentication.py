@@ -0,0 +1,82 @@
+import copy
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.transaction import on_commit
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .cache import make_cache_key
+
+TOKEN_CACHE_PREFIX = 'token'
+
+
+class LocalTTLCache:
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+local_token_cache = LocalTTLCache(
+    settings.TOKEN_AUTH_LOCAL_MAX_SIZE, settings.TOKEN_AUTH_LOCAL_TIMEOUT
+)
+
+
+def invalidate_token(key: str) -> None:
+    def invalidate():
+        local_token_cache.delete(key)
+        cache.delete(make_cache_key(TOKEN_CACHE_PREFIX, key))
+    on_commit(invalidate)
+
+
+def get_cached_user(key: str):
+    user = local_token_cache.get(key)
+    if user is None:
+        user = cache.get(make_cache_key(TOKEN_CACHE_PREFIX, key))
+    return user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        user = local_token_cache.get(key)
+        if user is None:
+            cache_key = make_cache_key(TOKEN_CACHE_PREFIX, key)
+            user = cache.get(cache_key)
+            if user is None:
+                user, _ = super().authenticate_credentials(key)
+                cache.set(
+                    cache_key, user, settings.TOKEN_AUTH_CACHE_TIMEOUT
+                )
+            local_token_cache.set(key, user)
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        user = copy.copy(user)
+        return user, self.get_model()(key=key, user=user)
@@ -0,0 +1,62 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db.transaction import on_commit
+
+CART_VERSION = 'cart:{}'
+FAVORITES_VERSION = 'favorites:{}'
+FOLLOWS_VERSION = 'follows:{}'
+INGREDIENTS_VERSION = 'ingredients'
+RECIPES_VERSION = 'recipes'
+TAGS_VERSION = 'tags'
+VERSION_KEY = 'version:{}'
+VERSION_CACHE = 'versions'
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+def get_shared_cache():
+    return caches[VERSION_CACHE]
+
+
+def get_version(name: str) -> int:
+    cache = get_shared_cache()
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        # Seeding from the clock keeps a re-created counter ahead of every
+        # generation handed out before the old one was evicted.
+        version = _now()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_versions(*names: str) -> dict:
+    keys = {VERSION_KEY.format(name): name for name in names}
+    found = get_shared_cache().get_many(keys)
+    return {
+        name: found[key] if key in found else get_version(name)
+        for key, name in keys.items()
+    }
+
+
+def bump_version(name: str) -> None:
+    cache = get_shared_cache()
+    key = VERSION_KEY.format(name)
+    cache.set(key, max(_now(), cache.get(key, 0) + 1), None)
+
+
+def bump_version_on_commit(*names: str) -> None:
+    def bump():
+        for name in names:
+            bump_version(name)
+    on_commit(bump)
+
+
+def make_cache_key(prefix: str, *parts) -> str:
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'{prefix}:{digest}'
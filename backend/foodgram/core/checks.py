@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .cache import VERSION_CACHE
+
+LOCAL_MEMORY_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register()
+def check_version_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(VERSION_CACHE, {}).get('BACKEND')
+    if backend != LOCAL_MEMORY_BACKEND:
+        return []
+    return [Warning(
+        f'Cache "{VERSION_CACHE}" uses {backend}.',
+        hint=(
+            'Version counters are then private to each process, so writes '
+            'made by other workers and management commands never '
+            'invalidate cached responses. Use a shared backend.'
+        ),
+        id='core.W001'
+    )]
@@ -0,0 +1,124 @@
+import threading
+from time import monotonic
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions, extras
+
+from ..postgresql.base import DatabaseWrapper as HealthCheckDatabaseWrapper
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, conn_params, min_size, max_size, timeout):
+        self.conn_params = conn_params
+        self.max_size = max_size
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.idle = [self.connect() for _ in range(min_size)]
+        self.size = len(self.idle)
+
+    def connect(self):
+        connection = base.Database.connect(**self.conn_params)
+        extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda value: value
+        )
+        return connection
+
+    def getconn(self):
+        deadline = monotonic() + self.timeout
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise base.Database.OperationalError(
+                        f'Connection pool exhausted after waiting '
+                        f'{self.timeout} seconds'
+                    )
+                self.condition.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.size += 1
+        try:
+            return self.connect()
+        except base.Database.Error:
+            self.discard()
+            raise
+
+    def putconn(self, connection, close=False):
+        if not close and not connection.closed:
+            status = connection.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except base.Database.Error:
+                    close = True
+        if close or connection.closed:
+            try:
+                connection.close()
+            except base.Database.Error:
+                pass
+            self.discard()
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+
+class DatabaseWrapper(HealthCheckDatabaseWrapper):
+    def __init__(self, settings_dict, *args, **kwargs):
+        # Connections go back to the pool at the end of each request;
+        # a persistent connection would keep one checked out per thread.
+        settings_dict['CONN_MAX_AGE'] = 0
+        super().__init__(settings_dict, *args, **kwargs)
+
+    def get_pool(self, conn_params):
+        with pools_lock:
+            if self.alias not in pools:
+                pools[self.alias] = ConnectionPool(
+                    conn_params,
+                    self.settings_dict.get('POOL_MIN_SIZE', 1),
+                    self.settings_dict.get('POOL_MAX_SIZE', 10),
+                    self.settings_dict.get('POOL_TIMEOUT', 10)
+                )
+            return pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        connection = pool.getconn()
+        if self.health_check_enabled and not self.__is_alive(connection):
+            pool.putconn(connection, close=True)
+            connection = pool.getconn()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        if connection.isolation_level != self.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            pools[self.alias].putconn(
+                self.connection,
+                close=self.errors_occurred or bool(self.connection.closed)
+            )
+
+    def __is_alive(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
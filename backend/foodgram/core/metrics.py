@@ -0,0 +1,201 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from time import monotonic, perf_counter
+
+from django.conf import settings
+
+SECONDS_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+HISTOGRAMS = (
+    ('request_duration_seconds', 'Request latency', SECONDS_BUCKETS),
+    ('db_queries', 'Database queries per request', QUERY_BUCKETS),
+    ('db_duration_seconds', 'Database time per request', SECONDS_BUCKETS),
+    ('serialize_duration_seconds', 'Serializer time', SECONDS_BUCKETS),
+    ('render_duration_seconds', 'Response render time', SECONDS_BUCKETS),
+)
+METRIC_PREFIX = 'foodgram'
+ARCHIVE_NAME = 'archive.json'
+LOCK_NAME = '.lock'
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+
+
+def serialize(request, serializer):
+    started = perf_counter()
+    data = serializer.data
+    http_request = getattr(request, '_request', request)
+    http_request.serialize_duration = getattr(
+        http_request, 'serialize_duration', 0.0
+    ) + perf_counter() - started
+    return data
+
+
+def get_view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name
+    action = getattr(match.func, 'actions', {}).get(
+        request.method.lower(), request.method.lower()
+    )
+    return f'{view_class.__name__}.{action}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {name: {} for name, _, _ in HISTOGRAMS}
+        self.buckets = {name: buckets for name, _, buckets in HISTOGRAMS}
+        self.flushed = monotonic()
+        self.observed = False
+        self.started = False
+
+    def observe(self, view, values):
+        with self.lock:
+            self.observed = True
+            for name, value in values.items():
+                series = self.histograms[name].setdefault(view, {
+                    'buckets': [0] * (len(self.buckets[name]) + 1),
+                    'sum': 0,
+                    'count': 0
+                })
+                series['buckets'][bisect_left(self.buckets[name], value)] += 1
+                series['sum'] += value
+                series['count'] += 1
+        if monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not self.observed:
+            return
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        with self.lock:
+            if not self.started:
+                # A file for this pid belongs to a dead worker whose pid
+                # was reused, e.g. after a container restart.
+                _archive(directory, [path])
+                self.started = True
+            content = json.dumps(self.histograms)
+            self.flushed = monotonic()
+        temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        temporary.write_text(content)
+        os.replace(temporary, path)
+
+
+registry = Registry()
+if settings.METRICS_ENABLED:
+    atexit.register(registry.flush)
+
+
+def _merge(total, histograms):
+    for name, views in histograms.items():
+        for view, series in views.items():
+            merged = total[name].setdefault(view, {
+                'buckets': [0] * len(series['buckets']),
+                'sum': 0,
+                'count': 0
+            })
+            merged['buckets'] = [
+                left + right
+                for left, right in zip(merged['buckets'], series['buckets'])
+            ]
+            merged['sum'] += series['sum']
+            merged['count'] += series['count']
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load(paths):
+    total = {name: {} for name, _, _ in HISTOGRAMS}
+    for path in paths:
+        try:
+            _merge(total, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def _archive(directory, paths):
+    # Fold files of exited workers into one archive so that counters stay
+    # monotonic while the directory does not grow with every restart.
+    with open(directory / LOCK_NAME, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        paths = [path for path in paths if path.exists()]
+        if not paths:
+            return
+        archive = directory / ARCHIVE_NAME
+        content = json.dumps(_load([archive, *paths]))
+        temporary = archive.with_suffix('.tmp')
+        temporary.write_text(content)
+        os.replace(temporary, archive)
+        for path in paths:
+            path.unlink()
+
+
+def _archive_dead_workers(directory):
+    _archive(directory, [
+        path for path in directory.glob('*.json')
+        if path.stem.isdigit() and not _is_alive(int(path.stem))
+    ])
+
+
+def collect() -> dict:
+    registry.flush()
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    _archive_dead_workers(directory)
+    return _load(directory.glob('*.json'))
+
+
+def render_prometheus(histograms: dict) -> str:
+    lines = []
+    for name, description, buckets in HISTOGRAMS:
+        metric = f'{METRIC_PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {description} by view.')
+        lines.append(f'# TYPE {metric} histogram')
+        for view, series in sorted(histograms[name].items()):
+            cumulative = 0
+            for bound, count in zip(
+                [*map(str, buckets), '+Inf'], series['buckets']
+            ):
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{view="{view}",le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{metric}_sum{{view="{view}"}} {series["sum"]}')
+            lines.append(
+                f'{metric}_count{{view="{view}"}} {series["count"]}'
+            )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,110 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .authentication import CachedTokenAuthentication, get_cached_user
+from .cache import get_shared_cache
+from .metrics import QueryTimer, get_view_name, registry
+from .querylog import QueryLogger
+from .routers import replica_reads
+
+REPLICA_PIN_KEY = 'replica_pin:{}'
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        is_safe = request.method in SAFE_METHODS
+        with replica_reads(is_safe and not self.is_pinned(request)):
+            response = self.get_response(request)
+        if not is_safe and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+    def is_pinned(self, request):
+        if settings.REPLICA_PIN_COOKIE in request.COOKIES:
+            return True
+        keyword, _, key = request.headers.get(
+            'Authorization', ''
+        ).partition(' ')
+        if keyword != CachedTokenAuthentication.keyword or not key:
+            return False
+        user = get_cached_user(key)
+        if user is None:
+            return True
+        return get_shared_cache().get(
+            REPLICA_PIN_KEY.format(user.pk)
+        ) is not None
+
+    def pin(self, request, response):
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE,
+            '1',
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite='Lax'
+        )
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            get_shared_cache().set(
+                REPLICA_PIN_KEY.format(user.pk),
+                True,
+                settings.REPLICA_PIN_SECONDS
+            )
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        timer = QueryTimer()
+        request.serialize_duration = 0.0
+        request.render_duration = 0.0
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        registry.observe(get_view_name(request), {
+            'request_duration_seconds': perf_counter() - started,
+            'db_queries': timer.count,
+            'db_duration_seconds': timer.duration,
+            'serialize_duration_seconds': request.serialize_duration,
+            'render_duration_seconds': request.render_duration
+        })
+        return response
+
+    def process_template_response(self, request, response):
+        started = perf_counter()
+
+        def record_render_duration(response):
+            request.render_duration = perf_counter() - started
+
+        response.add_post_render_callback(record_render_duration)
+        return response
+
+
+class QueryLogMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_LOG_ENABLED:
+            return self.get_response(request)
+        query_logger = QueryLogger(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_logger))
+            response = self.get_response(request)
+        query_logger.report_repeated_queries()
+        return response
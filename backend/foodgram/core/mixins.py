@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .cache import get_versions, make_cache_key
+from .metrics import serialize
+from .routers import primary_reads, reads_from_replica
+
+
+class ConditionalGetMixin:
+    cache_versions = ()
+    anonymous_cache_timeout = None
+
+    def get_cache_versions(self):
+        return self.cache_versions
+
+    def __conditional_response(self, request, handler, *args, **kwargs):
+        versions = get_versions(*self.get_cache_versions())
+        key = make_cache_key(
+            type(self).__name__,
+            self.action,
+            sorted(versions.items()),
+            request.get_host(),
+            request.user.pk,
+            sorted(kwargs.items()),
+            sorted(
+                (param, sorted(values))
+                for param, values in request.query_params.lists()
+            )
+        )
+        etag = f'W/"{key}"'
+        last_modified = max(versions.values()) // 1000
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        validated = True
+        if response is None:
+            if request.user.is_anonymous and self.anonymous_cache_timeout:
+                response = self.__cached(
+                    request, key, handler, *args, **kwargs
+                )
+            else:
+                # A lagging replica can return data older than the versions
+                # in the key, so its responses get no validators.
+                validated = not reads_from_replica()
+                response = handler(request, *args, **kwargs)
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            if validated:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def __cached(self, request, key, handler, *args, **kwargs):
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        cache.set(key, response.data, self.anonymous_cache_timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.__conditional_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.__conditional_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+
+class SerializationTimingMixin:
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize(
+                request, self.get_serializer(page, many=True)
+            ))
+        return Response(serialize(
+            request, self.get_serializer(queryset, many=True)
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialize(
+            request, self.get_serializer(self.get_object())
+        ))
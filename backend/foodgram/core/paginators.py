@@ -1,6 +1,172 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from .cache import get_versions, make_cache_key
+from .routers import primary_reads
+
+COUNT_QUERY_PARAM = 'count'
+COUNT_STRATEGIES = ('exact', 'cached', 'estimate')
+
+
+def get_count_strategy(request):
+    strategy = request.query_params.get(COUNT_QUERY_PARAM)
+    if strategy in COUNT_STRATEGIES:
+        return strategy
+    return settings.PAGINATION_COUNT_STRATEGY
+
+
+def _estimate_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+def _cached_count(queryset, view):
+    get_cache_versions = getattr(view, 'get_cache_versions', None)
+    if get_cache_versions is None:
+        return queryset.count()
+    try:
+        sql = str(queryset.order_by().values('pk').query)
+    except EmptyResultSet:
+        return 0
+    key = make_cache_key(
+        'count', sql, sorted(get_versions(*get_cache_versions()).items())
+    )
+    count = cache.get(key)
+    if count is None:
+        with primary_reads():
+            count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def get_count(queryset, strategy, view=None):
+    if strategy == 'estimate':
+        count = _estimate_count(queryset)
+        if count is not None:
+            return count
+        strategy = 'cached'
+    if strategy == 'cached':
+        return _cached_count(queryset, view)
+    return queryset.count()
+
+
+class ProbedPage(Page):
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+class CountingPaginator(Paginator):
+    def __init__(self, object_list, per_page, count_strategy='exact',
+                 view=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+        self.view = view
+        self.seen = 0
+        self.known_count = None
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        count = get_count(self.object_list, self.count_strategy, self.view)
+        return max(count, self.seen)
+
+    def page(self, number):
+        if self.count_strategy != 'estimate':
+            return super().page(number)
+        # An estimated count must not decide page bounds, so fetch one
+        # extra row to learn whether a next page exists.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        self.seen = bottom + len(rows)
+        if not more:
+            self.known_count = self.seen
+        return ProbedPage(rows, number, self, more)
+
+
+class IdCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if COUNT_QUERY_PARAM in request.query_params:
+            self.count = get_count(
+                queryset, get_count_strategy(request), view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        content = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ])
+        if self.count is not None:
+            content['count'] = self.count
+            content.move_to_end('count', last=False)
+        return Response(content)
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+    cursor_pagination_class = IdCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        self.django_paginator_class = partial(
+            CountingPaginator,
+            count_strategy=get_count_strategy(request),
+            view=view
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+
+from .metrics import get_view_name
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_MODULES = ('core.metrics', 'core.middleware', __name__)
+
+LITERAL_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bIN \(\?(?:, ?\?)*\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql: str) -> str:
+    for pattern, replacement in LITERAL_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint_id(normalized_sql: str) -> str:
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:16]
+
+
+def innermost_project_frame() -> str:
+    project_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        module = frame.f_globals.get('__name__')
+        if (
+            filename.startswith(project_dir)
+            and 'site-packages' not in filename
+            and module not in INSTRUMENTATION_MODULES
+        ):
+            return f'{module}:{frame.f_code.co_name}:{frame.f_lineno}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+            **getattr(record, 'data', {})
+        }, default=str)
+
+
+class QueryLogger:
+    def __init__(self, request):
+        self.request = request
+        self.counts = Counter()
+        self.frames = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            normalized = fingerprint(sql)
+            self.counts[normalized] += 1
+            if (
+                self.counts[normalized]
+                == settings.QUERY_LOG_N_PLUS_ONE_THRESHOLD
+            ):
+                self.frames[normalized] = innermost_project_frame()
+            if (
+                duration * 1000 >= settings.QUERY_LOG_SLOW_MS
+                and random.random() < settings.QUERY_LOG_SAMPLE_RATE
+            ):
+                self.log('slow_query', normalized, {
+                    'duration_ms': round(duration * 1000, 3),
+                    'frame': innermost_project_frame(),
+                })
+
+    def log(self, event, normalized, data):
+        logger.warning(event, extra={'data': {
+            'fingerprint': fingerprint_id(normalized),
+            'sql': normalized,
+            'method': self.request.method,
+            'path': self.request.path,
+            'view': get_view_name(self.request),
+            **data
+        }})
+
+    def report_repeated_queries(self) -> None:
+        for normalized, count in self.counts.items():
+            if count >= settings.QUERY_LOG_N_PLUS_ONE_THRESHOLD:
+                self.log('n_plus_one_candidate', normalized, {
+                    'count': count,
+                    'frame': self.frames.get(normalized, 'unknown'),
+                })
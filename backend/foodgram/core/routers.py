@@ -0,0 +1,58 @@
+import threading
+from contextlib import contextmanager
+from itertools import count
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+state = threading.local()
+
+
+@contextmanager
+def replica_reads(enabled: bool):
+    state.replica_reads = enabled
+    try:
+        yield
+    finally:
+        state.replica_reads = False
+
+
+@contextmanager
+def primary_reads():
+    enabled = getattr(state, 'replica_reads', False)
+    state.replica_reads = False
+    try:
+        yield
+    finally:
+        state.replica_reads = enabled
+
+
+def reads_from_replica() -> bool:
+    return bool(settings.DATABASE_REPLICAS) and getattr(
+        state, 'replica_reads', False
+    )
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.counter = count()
+
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            replicas = settings.DATABASE_REPLICAS
+            return replicas[next(self.counter) % len(replicas)]
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = settings.DATABASES
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,105 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe
+from recipes.utils import get_tag_ids
+from tags.models import Tag
+from users.models import User
+from .cache import get_shared_cache
+from .middleware import REPLICA_PIN_KEY
+from .routers import primary_reads, replica_reads
+
+REPLICA = 'replica'
+
+# A second test database that never receives the primary's writes, so every
+# read routed to it looks like a read from a lagging replica.
+settings.DATABASES.setdefault(REPLICA, {
+    **settings.DATABASES[DEFAULT_DB_ALIAS],
+    'TEST': {}
+})
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Needs two SQLite databases')
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(APITestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader',
+            email='reader@example.com',
+            password='password',
+            first_name='Reader',
+            last_name='Reader'
+        )
+        cls.tag = Tag.objects.create(name='tag', color='#000000', slug='tag')
+        cls.recipe = Recipe.objects.create(
+            author=cls.user,
+            name='recipe',
+            image='recipes/images/recipe.png',
+            text='text',
+            cooking_time=10
+        )
+
+    def setUp(self):
+        cache.clear()
+        get_shared_cache().delete(REPLICA_PIN_KEY.format(self.user.pk))
+
+    def test_reads_use_replica_only_when_enabled(self):
+        self.assertTrue(Tag.objects.exists())
+        with replica_reads(True):
+            self.assertFalse(Tag.objects.exists())
+            with primary_reads():
+                self.assertTrue(Tag.objects.exists())
+            self.assertFalse(Tag.objects.exists())
+        self.assertTrue(Tag.objects.exists())
+
+    def test_writes_use_primary(self):
+        with replica_reads(True):
+            Tag.objects.create(name='new', color='#000001', slug='new')
+        self.assertTrue(Tag.objects.filter(slug='new').exists())
+        self.assertFalse(
+            Tag.objects.using(REPLICA).filter(slug='new').exists()
+        )
+
+    def test_unpinned_get_has_no_validators(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/tags/')
+        self.assertEqual(response.data, [])
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_write_pins_next_reads_to_primary(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(f'/api/recipes/{self.recipe.pk}/favorite/')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        response = self.client.get('/api/tags/')
+        self.assertEqual(len(response.data), 1)
+        self.assertIn('ETag', response)
+
+    def test_token_pin_is_shared_between_clients(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        # An unknown token cannot be checked for a pin and reads the primary.
+        self.assertEqual(len(self.client.get('/api/tags/').data), 1)
+        self.assertEqual(self.client.get('/api/tags/').data, [])
+        get_shared_cache().set(REPLICA_PIN_KEY.format(self.user.pk), True)
+        self.assertEqual(len(self.client.get('/api/tags/').data), 1)
+
+    def test_anonymous_cache_is_filled_from_primary(self):
+        for _ in range(2):
+            response = self.client.get('/api/recipes/')
+            self.assertEqual(len(response.data['results']), 1)
+            self.assertIn('ETag', response)
+
+    def test_cached_lookups_are_filled_from_primary(self):
+        with replica_reads(True):
+            self.assertEqual(get_tag_ids(), {self.tag.slug: self.tag.pk})
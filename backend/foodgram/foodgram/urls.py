@@ -3,8 +3,11 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', metrics, name='metrics'),
     path('api/', include('users.urls')),
     path('api/', include('tags.urls')),
     path('api/', include('recipes.urls'))
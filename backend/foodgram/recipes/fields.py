@@ -1,13 +1,49 @@
 import base64
+import binascii
 
-from django.core.files.base import ContentFile
-from rest_framework.serializers import ImageField
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from rest_framework.serializers import ImageField, ValidationError
+
+BASE64_MARKER = ';base64,'
+DECODE_CHUNK_SIZE = 64 * 1024
 
 
 class Base64ImageField(ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            _format, _imgstr = data.split(';base64,')
-            ext = _format.split('/')[-1]
-            data = ContentFile(base64.b64decode(_imgstr), name='temp.' + ext)
+            data = self.decode(data)
         return super().to_internal_value(data)
+
+    def decode(self, data: str) -> TemporaryUploadedFile:
+        marker_index = data.find(BASE64_MARKER)
+        if marker_index == -1:
+            raise ValidationError('Invalid base64 image data')
+        ext = data[:marker_index].split('/')[-1]
+        start = marker_index + len(BASE64_MARKER)
+        if (len(data) - start) // 4 * 3 > settings.RECIPE_IMAGE_MAX_SIZE:
+            raise ValidationError(
+                'Image size must not exceed '
+                f'{settings.RECIPE_IMAGE_MAX_SIZE} bytes'
+            )
+
+        file = TemporaryUploadedFile('temp.' + ext, f'image/{ext}', 0, None)
+        remainder = ''
+        try:
+            for offset in range(start, len(data), DECODE_CHUNK_SIZE):
+                # Line-wrapped payloads are valid, so drop whitespace and
+                # carry the tail to keep every decoded piece 4-char aligned.
+                chunk = remainder + ''.join(
+                    data[offset:offset + DECODE_CHUNK_SIZE].split()
+                )
+                aligned = len(chunk) - len(chunk) % 4
+                file.write(base64.b64decode(chunk[:aligned], validate=True))
+                remainder = chunk[aligned:]
+            if remainder:
+                raise binascii.Error('Incorrect padding')
+        except binascii.Error:
+            file.close()
+            raise ValidationError('Invalid base64 image data')
+        file.size = file.tell()
+        file.seek(0)
+        return file
@@ -1,18 +1,35 @@
+from django.db.models import Case, Exists, IntegerField, OuterRef, Value, When
 from django_filters.rest_framework import FilterSet, filters
 
 from .models import Ingredient, Recipe
+from .utils import get_tag_ids
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_tag_ids()]
 
 
 class IngredientFilter(FilterSet):
-    name = filters.CharFilter(lookup_expr='icontains')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ['name']
 
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(name__icontains=value).annotate(
+            search_rank=Case(
+                When(name__istartswith=value, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).order_by('search_rank', 'name')
+
 
 class RecipeFilters(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices, method='filter_tags'
+    )
     author = filters.NumberFilter(field_name='author', lookup_expr='exact')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(method='filter_is_in_cart')
@@ -21,6 +38,13 @@ class RecipeFilters(FilterSet):
         model = Recipe
         fields = ['tags']
 
+    def filter_tags(self, queryset, name, value):
+        tag_ids = get_tag_ids()
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'),
+            tag_id__in=[tag_ids[slug] for slug in value]
+        )))
+
     def filter_is_favorited(self, queryset, name, value):
         if value and not self.request.user.is_anonymous:
             return queryset.filter(is_favorite__user=self.request.user)
@@ -0,0 +1,88 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.db.models import Q
+from django.db.transaction import on_commit
+from PIL import Image
+
+from core.cache import RECIPES_VERSION, bump_version
+from .models import Recipe
+
+WEBP_QUALITY = 80
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix='recipe-images'
+)
+
+
+def _to_webp(image: Image.Image) -> ContentFile:
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, 'WEBP', quality=WEBP_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def build_image_variants(recipe_id: int, image_name: str) -> None:
+    recipe = Recipe(pk=recipe_id, image=image_name)
+    with recipe.image.open('rb') as file:
+        image = Image.open(file)
+        image.load()
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+
+    recipe.image_webp.save(f'{stem}.webp', _to_webp(image), save=False)
+    image.thumbnail(
+        (settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_THUMBNAIL_SIZE)
+    )
+    recipe.image_thumbnail.save(
+        f'{stem}.webp', _to_webp(image), save=False
+    )
+    if Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        image_thumbnail=recipe.image_thumbnail.name,
+        image_webp=recipe.image_webp.name
+    ):
+        bump_version(RECIPES_VERSION)
+
+
+def _build_in_background(recipe_id: int, image_name: str) -> None:
+    try:
+        build_image_variants(recipe_id, image_name)
+    except Exception:
+        logger.exception('Cannot build image variants for %s', image_name)
+    finally:
+        connections.close_all()
+
+
+def schedule_image_variants(recipe: Recipe) -> None:
+    recipe_id, image_name = recipe.pk, recipe.image.name
+    on_commit(lambda: executor.submit(
+        _build_in_background, recipe_id, image_name
+    ))
+
+
+def _delete_unused_files(names: list) -> None:
+    used = set()
+    for row in Recipe.objects.filter(
+        Q(image__in=names)
+        | Q(image_thumbnail__in=names)
+        | Q(image_webp__in=names)
+    ).values_list('image', 'image_thumbnail', 'image_webp'):
+        used.update(row)
+    storage = Recipe._meta.get_field('image').storage
+    for name in names:
+        if name not in used:
+            storage.delete(name)
+
+
+def delete_image_files(names: list) -> None:
+    names = [name for name in names if name]
+    if names:
+        on_commit(lambda: _delete_unused_files(names))
@@ -0,0 +1,60 @@
+import random
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.filters import IngredientFilter
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+
+class Command(BaseCommand):
+    help = 'Compare ingredient name search through the DB and the index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list('name', flat=True))
+        if not names:
+            raise CommandError('Ingredient table is empty')
+        rand = random.Random(options['seed'])
+        terms = []
+        for _ in range(options['terms']):
+            name = rand.choice(names)
+            start = rand.randrange(len(name))
+            terms.append(name[start:start + rand.randint(1, 5)])
+
+        limit = settings.INGREDIENT_SEARCH_LIMIT
+        ingredient_filter = IngredientFilter()
+        ingredient_index.invalidate()
+        started = perf_counter()
+        ingredient_index.search('', limit)
+        self.stdout.write(
+            f'index build: {(perf_counter() - started) * 1000:.1f} ms '
+            f'for {len(names)} ingredients'
+        )
+        self.report('icontains', terms, lambda term: list(
+            ingredient_filter.filter_name(
+                Ingredient.objects.all(), 'name', term
+            ).values('id', 'name', 'measurement_unit')[:limit]
+        ))
+        self.report('index', terms, lambda term: ingredient_index.search(
+            term, limit
+        ))
+
+    def report(self, label, terms, search):
+        timings = []
+        for term in terms:
+            started = perf_counter()
+            search(term)
+            timings.append((perf_counter() - started) * 1000)
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{label}: p50 {median(timings):.3f} ms, '
+            f'p99 {p99:.3f} ms, max {timings[-1]:.3f} ms'
+        )
@@ -0,0 +1,45 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from recipes.renderers import (ShoppingListCSVRenderer,
+                               ShoppingListPDFRenderer,
+                               ShoppingListTextRenderer)
+
+RENDERERS = (
+    ShoppingListPDFRenderer,
+    ShoppingListCSVRenderer,
+    ShoppingListTextRenderer,
+    JSONRenderer
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare shopping list render times per export format'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        ingredients = [
+            {
+                'name': f'ингредиент {index}',
+                'measurement_unit': 'г',
+                'amount': index * 10
+            }
+            for index in range(options['rows'])
+        ]
+        for renderer_class in RENDERERS:
+            renderer = renderer_class()
+            timings = []
+            for _ in range(options['repeat']):
+                started = perf_counter()
+                content = renderer.render(ingredients)
+                timings.append((perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'{renderer.format}: median {median(timings):.3f} ms, '
+                f'max {max(timings):.3f} ms, {len(content)} bytes'
+            )
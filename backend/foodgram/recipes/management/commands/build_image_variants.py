@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_image_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Build missing thumbnail and WebP variants of recipe images'
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.filter(image_thumbnail='').exclude(
+            image=''
+        ).values_list('id', 'image')
+        built = 0
+        for recipe_id, image_name in recipes.iterator():
+            try:
+                build_image_variants(recipe_id, image_name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{image_name}: {error}')
+                continue
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f'Built variants for {built}'))
@@ -0,0 +1,146 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from core.cache import VERSION_CACHE
+from recipes.models import Recipe
+from tags.models import Tag
+from users.models import User
+
+ENDPOINTS = (
+    '/api/recipes/?count=exact',
+    '/api/recipes/?cursor=',
+    '/api/recipes/?is_favorited=1&count=exact',
+    '/api/recipes/?is_in_shopping_cart=1&count=exact',
+    '/api/recipes/?author={author_id}&count=exact',
+    '/api/recipes/?tags={tag_slug}&count=exact',
+    '/api/users/subscriptions/',
+    '/api/recipes/download_shopping_cart/?format=json',
+)
+SCANS = ('Seq Scan', 'Index Scan', 'Index Only Scan')
+MIN_ROWS = 1000
+DUMMY_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    for alias in ('default', VERSION_CACHE)
+}
+
+
+def iter_plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from iter_plan_nodes(child)
+
+
+def is_unindexed_scan(node):
+    # Rows read only to be thrown away by a filter point at a missing index;
+    # a scan without a filter means the query needs the whole relation.
+    return (
+        node['Node Type'] in SCANS
+        and 'Filter' in node
+        and 'Index Cond' not in node
+    )
+
+
+def get_small_tables(cursor, min_rows):
+    cursor.execute(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples < %s",
+        [min_rows]
+    )
+    return {table for table, in cursor.fetchall()}
+
+
+def find_unindexed_scans(cursor, sql):
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        node for node in iter_plan_nodes(plan[0]['Plan'])
+        if is_unindexed_scan(node)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Fail if hot API endpoints scan tables without an index condition '
+        '(needs seed data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='User id to send requests as (defaults to the first user)'
+        )
+        parser.add_argument(
+            '--ignore-table',
+            action='append',
+            default=[],
+            help='Table allowed to be scanned without an index condition'
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=MIN_ROWS,
+            help='Skip tables the planner estimates to be smaller than this'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans are only checked on PostgreSQL')
+        user = self.get_user(options['user'])
+        tag_slug = Tag.objects.values_list('slug', flat=True).first()
+        author_id = Recipe.objects.values_list(
+            'author_id', flat=True
+        ).first()
+        if tag_slug is None or author_id is None:
+            raise CommandError('Seed the database with tags and recipes first')
+
+        with connection.cursor() as cursor:
+            ignored = get_small_tables(cursor, options['min_rows'])
+        ignored.update(options['ignore_table'])
+
+        client = APIClient()
+        client.force_authenticate(user)
+        failures = 0
+        for endpoint in ENDPOINTS:
+            url = endpoint.format(author_id=author_id, tag_slug=tag_slug)
+            for sql in self.capture_selects(client, url):
+                with connection.cursor() as cursor:
+                    scans = [
+                        f'{node["Node Type"]} on {node["Relation Name"]}'
+                        for node in find_unindexed_scans(cursor, sql)
+                        if node['Relation Name'] not in ignored
+                    ]
+                if scans:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'{url}: {", ".join(scans)}\n  {sql}'
+                    ))
+            self.stdout.write(f'Checked {url}')
+
+        if failures:
+            raise CommandError(f'{failures} queries scan without an index')
+        self.stdout.write(self.style.SUCCESS('No unindexed scans found'))
+
+    def get_user(self, user_id):
+        users = User.objects.order_by('id')
+        user = users.filter(pk=user_id).first() if user_id else users.first()
+        if user is None:
+            raise CommandError('No such user')
+        return user
+
+    def capture_selects(self, client, url):
+        with override_settings(
+            CACHES=DUMMY_CACHES, ALLOWED_HOSTS=['testserver']
+        ), CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+import re
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.cache import INGREDIENTS_VERSION, RECIPES_VERSION, bump_version
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+JSON_BLOCK_SIZE = 64 * 1024
+STAGING_TABLE = 'recipes_ingredient_staging'
+JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_csv(file):
+    for line_number, row in enumerate(csv.reader(file), 1):
+        if not row:
+            continue
+        if len(row) != 2:
+            raise CommandError(f'Line {line_number}: expected name,unit')
+        yield row[0].strip(), row[1].strip()
+
+
+def iter_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_BLOCK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Expected a JSON array of ingredients')
+    position = 1
+    index = 0
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError
+            item, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            block = file.read(JSON_BLOCK_SIZE)
+            if not block:
+                raise CommandError('Unexpected end of JSON data')
+            buffer = buffer[position:] + block
+            position = 0
+            continue
+        try:
+            row = item['name'].strip(), item['measurement_unit'].strip()
+        except (KeyError, TypeError, AttributeError):
+            raise CommandError(
+                f'Item {index}: expected an object with string name and '
+                'measurement_unit'
+            )
+        index += 1
+        yield row
+
+
+def iter_chunks(rows, size):
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+class Command(BaseCommand):
+    help = 'Load or update ingredients from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=['csv', 'json'])
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Use COPY into a staging table (PostgreSQL only)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.is_file():
+            raise CommandError(f'No such file: {path}')
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError('Cannot detect file format, use --format')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy is only supported on PostgreSQL')
+
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = iter_csv(file) if file_format == 'csv' else iter_json(file)
+            chunks = iter_chunks(rows, options['chunk_size'])
+            with transaction.atomic():
+                if options['copy']:
+                    created, updated = self.copy(chunks)
+                else:
+                    created, updated = self.upsert(chunks)
+
+        bump_version(INGREDIENTS_VERSION)
+        bump_version(RECIPES_VERSION)
+        ingredient_index.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {created} created, {updated} updated'
+        ))
+
+    def report(self, processed):
+        self.stdout.write(f'Processed {processed} rows')
+
+    def upsert(self, chunks):
+        created = updated = processed = 0
+        for chunk in chunks:
+            units = dict(chunk)
+            existing = Ingredient.objects.filter(name__in=units).only(
+                'id', 'name', 'measurement_unit'
+            )
+            changed = []
+            for ingredient in existing:
+                unit = units.pop(ingredient.name)
+                if ingredient.measurement_unit != unit:
+                    ingredient.measurement_unit = unit
+                    changed.append(ingredient)
+            Ingredient.objects.bulk_update(changed, ['measurement_unit'])
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in units.items()
+                ],
+                ignore_conflicts=True
+            )
+            created += len(units)
+            updated += len(changed)
+            processed += len(chunk)
+            self.report(processed)
+        return created, updated
+
+    def copy(self, chunks):
+        processed = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE {STAGING_TABLE} ('
+                'position serial, name varchar(200), '
+                'measurement_unit varchar(200)) ON COMMIT DROP'
+            )
+            for chunk in chunks:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f'COPY {STAGING_TABLE} (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)',
+                    buffer
+                )
+                processed += len(chunk)
+                self.report(processed)
+            cursor.execute(
+                f'INSERT INTO {Ingredient._meta.db_table} '
+                '(name, measurement_unit) '
+                'SELECT DISTINCT ON (name) name, measurement_unit '
+                f'FROM {STAGING_TABLE} ORDER BY name, position DESC '
+                'ON CONFLICT (name) DO UPDATE '
+                'SET measurement_unit = EXCLUDED.measurement_unit '
+                f'WHERE {Ingredient._meta.db_table}.measurement_unit '
+                'IS DISTINCT FROM EXCLUDED.measurement_unit '
+                'RETURNING xmax = 0'
+            )
+            inserted = [row[0] for row in cursor.fetchall()]
+        return inserted.count(True), inserted.count(False)
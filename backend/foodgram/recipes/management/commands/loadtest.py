@@ -0,0 +1,205 @@
+import json
+import math
+import random
+import threading
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import VERSION_CACHE
+from core.paginators import CustomPagination
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+ENDPOINTS = ('recipes', 'subscriptions', 'ingredients', 'shopping_cart')
+MAX_RECIPE_PAGE = 20
+SEARCH_PREFIX_LENGTH = 3
+DUMMY_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    for alias in ('default', VERSION_CACHE)
+}
+GATES = (
+    ('max_p50', 'p50'),
+    ('max_p95', 'p95'),
+    ('max_p99', 'p99'),
+    ('max_queries', 'queries_max'),
+)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive hot API endpoints in-process and report latency percentiles '
+        'and query counts. Creates auth tokens for the sampled users.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Number of threads sending requests'
+        )
+        parser.add_argument(
+            '--endpoint', action='append', choices=ENDPOINTS
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Run with a dummy cache backend'
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--max-p50', type=float, help='Gate, ms')
+        parser.add_argument('--max-p95', type=float, help='Gate, ms')
+        parser.add_argument('--max-p99', type=float, help='Gate, ms')
+        parser.add_argument(
+            '--max-queries', type=int, help='Gate, queries per request'
+        )
+        parser.add_argument('--output', help='Write the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        self.rng = random.Random(options['seed'])
+        self.prepare(options['users'])
+
+        overrides = {'ALLOWED_HOSTS': ['testserver']}
+        if options['no_cache']:
+            overrides['CACHES'] = DUMMY_CACHES
+        report = {}
+        with override_settings(**overrides):
+            for endpoint in options['endpoint'] or ENDPOINTS:
+                report[endpoint] = self.run(
+                    endpoint,
+                    options['warmup'],
+                    options['requests'],
+                    options['concurrency']
+                )
+                self.write_stats(endpoint, report[endpoint])
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+        self.check_gates(report, options)
+
+    def prepare(self, users_count):
+        users = list(User.objects.order_by('?')[:users_count])
+        if not users:
+            raise CommandError('No users found, run seed_data first')
+        self.tokens = [
+            Token.objects.get_or_create(user=user)[0].key for user in users
+        ]
+        self.names = list(
+            Ingredient.objects.order_by('?').values_list('name', flat=True)[
+                :users_count
+            ]
+        ) or ['']
+        self.pages = max(1, min(
+            MAX_RECIPE_PAGE,
+            Recipe.objects.count() // CustomPagination.page_size
+        ))
+        self.local = threading.local()
+
+    def make_url(self, endpoint):
+        if endpoint == 'recipes':
+            return f'/api/recipes/?page={self.rng.randint(1, self.pages)}'
+        if endpoint == 'subscriptions':
+            return '/api/users/subscriptions/?recipes_limit=3'
+        if endpoint == 'ingredients':
+            name = self.rng.choice(self.names)[:SEARCH_PREFIX_LENGTH]
+            return f'/api/ingredients/?name={name}'
+        return '/api/recipes/download_shopping_cart/'
+
+    def request(self, url, token):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = APIClient()
+        with CaptureQueriesContext(connection) as context:
+            started = perf_counter()
+            response = client.get(url, HTTP_AUTHORIZATION=f'Token {token}')
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = (perf_counter() - started) * 1000
+        close_old_connections()
+        return response.status_code, elapsed, len(context.captured_queries)
+
+    def work(self, jobs, results):
+        try:
+            for url, token in jobs:
+                results.append(self.request(url, token))
+        finally:
+            connections.close_all()
+
+    def send(self, jobs, concurrency):
+        results = [[] for _ in range(concurrency)]
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(jobs[index::concurrency], results[index])
+            )
+            for index in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [result for chunk in results for result in chunk]
+
+    def run(self, endpoint, warmup, requests, concurrency):
+        jobs = [
+            (self.make_url(endpoint), self.rng.choice(self.tokens))
+            for _ in range(warmup + requests)
+        ]
+        self.send(jobs[:warmup], concurrency)
+        started = perf_counter()
+        results = self.send(jobs[warmup:], concurrency)
+        duration = perf_counter() - started
+        timings = [elapsed for _, elapsed, _ in results]
+        queries = [query_count for _, _, query_count in results]
+        errors = sum(status >= 400 for status, _, _ in results)
+        return {
+            'requests': requests,
+            'errors': errors,
+            'rps': requests / duration,
+            'p50': percentile(timings, 50),
+            'p95': percentile(timings, 95),
+            'p99': percentile(timings, 99),
+            'queries_avg': sum(queries) / requests,
+            'queries_max': max(queries),
+        }
+
+    def write_stats(self, endpoint, stats):
+        self.stdout.write(
+            f'{endpoint}: {stats["requests"]} requests, '
+            f'{stats["rps"]:.1f} req/s, '
+            f'p50 {stats["p50"]:.1f} ms, p95 {stats["p95"]:.1f} ms, '
+            f'p99 {stats["p99"]:.1f} ms, queries avg '
+            f'{stats["queries_avg"]:.1f} max {stats["queries_max"]}, '
+            f'errors {stats["errors"]}'
+        )
+
+    def check_gates(self, report, options):
+        failures = [
+            f'{endpoint}: {metric} {stats[metric]:.1f} > {options[gate]}'
+            for endpoint, stats in report.items()
+            for gate, metric in GATES
+            if options[gate] is not None and stats[metric] > options[gate]
+        ]
+        failures.extend(
+            f'{endpoint}: {stats["errors"]} failed requests'
+            for endpoint, stats in report.items() if stats['errors']
+        )
+        if failures:
+            raise CommandError('Load test failed:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Load test passed'))
@@ -0,0 +1,218 @@
+import random
+from itertools import accumulate
+from time import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.cache import (INGREDIENTS_VERSION, RECIPES_VERSION, TAGS_VERSION,
+                        bump_version)
+from recipes.models import (Cart, Ingredient, IngredientRecipe, Recipe,
+                            RecipeFollow)
+from recipes.search import ingredient_index
+from tags.models import Tag
+from users.models import User, UserFollow
+
+SEED_PASSWORD = 'seed-password'
+SEED_IMAGE = 'recipes/images/seed.png'
+TAG_COLORS = ('#E26C2D', '#49B64E', '#8775D2', '#2D9CDB', '#F2C94C')
+
+
+class Skewed:
+    def __init__(self, population, rng, exponent):
+        self.population = list(population)
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+
+    def choice(self):
+        return self.rng.choices(
+            self.population, cum_weights=self.cum_weights
+        )[0]
+
+    def sample(self, size):
+        if size * 2 > len(self.population):
+            return set(self.rng.sample(
+                self.population, min(size, len(self.population))
+            ))
+        picked = set()
+        while len(picked) < size:
+            picked.update(self.rng.choices(
+                self.population,
+                cum_weights=self.cum_weights,
+                k=size - len(picked)
+            ))
+        return picked
+
+
+class Command(BaseCommand):
+    help = 'Seed users, recipes, favorites, carts and follows with skew'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--tags', type=int, default=5)
+        parser.add_argument('--ingredients', type=int, default=2000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent for popularity of authors, recipes and '
+                 'ingredients'
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['recipes'] < 1:
+            raise CommandError('--users and --recipes must be positive')
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.prefix = f'seed{int(time())}_'
+
+        with transaction.atomic():
+            tag_ids = self.create_tags()
+            ingredient_ids = self.create_ingredients()
+            user_ids = self.create_users()
+            recipe_ids = self.create_recipes(user_ids)
+            self.link_recipes(recipe_ids, tag_ids, ingredient_ids)
+            self.create_activity(user_ids, recipe_ids)
+
+        for name in (INGREDIENTS_VERSION, RECIPES_VERSION, TAGS_VERSION):
+            bump_version(name)
+        ingredient_index.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users and {len(recipe_ids)} recipes '
+            f'(usernames start with {self.prefix})'
+        ))
+
+    def skewed(self, population):
+        return Skewed(population, self.rng, self.options['skew'])
+
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(
+            objects,
+            batch_size=self.options['batch_size'],
+            ignore_conflicts=True
+        )
+        self.stdout.write(f'{model.__name__}: {len(objects)} rows')
+
+    def create_tags(self):
+        self.bulk_create(Tag, [
+            Tag(
+                name=f'Тег {index}',
+                color=TAG_COLORS[index % len(TAG_COLORS)],
+                slug=f'tag-{index}'
+            )
+            for index in range(self.options['tags'])
+        ])
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_ingredients(self):
+        missing = self.options['ingredients'] - Ingredient.objects.count()
+        if missing > 0:
+            self.bulk_create(Ingredient, [
+                Ingredient(
+                    name=f'{self.prefix}ингредиент {index}',
+                    measurement_unit='г'
+                )
+                for index in range(missing)
+            ])
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        self.rng.shuffle(ingredient_ids)
+        return ingredient_ids
+
+    def create_users(self):
+        password = make_password(SEED_PASSWORD)
+        self.bulk_create(User, [
+            User(
+                username=f'{self.prefix}{index}',
+                email=f'{self.prefix}{index}@example.com',
+                first_name='Пользователь',
+                last_name=str(index),
+                password=password
+            )
+            for index in range(self.options['users'])
+        ])
+        return list(User.objects.filter(
+            username__startswith=self.prefix
+        ).values_list('id', flat=True))
+
+    def create_recipes(self, user_ids):
+        authors = self.skewed(user_ids)
+        self.bulk_create(Recipe, [
+            Recipe(
+                author_id=authors.choice(),
+                name=f'Рецепт {index}',
+                image=SEED_IMAGE,
+                text='Описание рецепта',
+                cooking_time=self.rng.randint(1, 180)
+            )
+            for index in range(self.options['recipes'])
+        ])
+        return list(Recipe.objects.filter(
+            author__username__startswith=self.prefix
+        ).values_list('id', flat=True))
+
+    def link_recipes(self, recipe_ids, tag_ids, ingredient_ids):
+        tags = self.skewed(tag_ids)
+        ingredients = self.skewed(ingredient_ids)
+        per_recipe = self.options['ingredients_per_recipe']
+        recipe_tags, recipe_ingredients = [], []
+        for recipe_id in recipe_ids:
+            recipe_tags.extend(
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                for tag_id in tags.sample(self.rng.randint(1, 3))
+            )
+            recipe_ingredients.extend(
+                IngredientRecipe(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=self.rng.randint(1, 500)
+                )
+                for ingredient_id in ingredients.sample(
+                    self.rng.randint(1, per_recipe * 2 - 1)
+                )
+            )
+        self.bulk_create(Recipe.tags.through, recipe_tags)
+        self.bulk_create(IngredientRecipe, recipe_ingredients)
+
+    def activity_size(self, average):
+        if average < 1:
+            return 0
+        return min(int(self.rng.expovariate(1 / average)), average * 20)
+
+    def create_activity(self, user_ids, recipe_ids):
+        recipes = self.skewed(recipe_ids)
+        authors = self.skewed(user_ids)
+        favorites, carts, follows = [], [], []
+        for user_id in user_ids:
+            favorites.extend(
+                RecipeFollow(user_id=user_id, recipe_id=recipe_id)
+                for recipe_id in recipes.sample(self.activity_size(
+                    self.options['favorites_per_user']
+                ))
+            )
+            carts.extend(
+                Cart(user_id=user_id, recipe_id=recipe_id)
+                for recipe_id in recipes.sample(self.activity_size(
+                    self.options['cart_per_user']
+                ))
+            )
+            follows.extend(
+                UserFollow(user_id=user_id, author_id=author_id)
+                for author_id in authors.sample(self.activity_size(
+                    self.options['follows_per_user']
+                ))
+                if author_id != user_id
+            )
+        self.bulk_create(RecipeFollow, favorites)
+        self.bulk_create(Cart, carts)
+        self.bulk_create(UserFollow, follows)
@@ -31,10 +31,13 @@ class Recipe(models.Model):
         related_name='tags',
         verbose_name='Теги'
     )
+    # Foreign keys that lead a composite index or unique constraint
+    # below skip their own single-column index.
     author = models.ForeignKey(
         User, models.CASCADE,
         related_name='recipes',
-        verbose_name='Автор'
+        verbose_name='Автор',
+        db_index=False
     )
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -46,6 +49,16 @@ class Recipe(models.Model):
         upload_to='recipes/images',
         verbose_name='Изображение'
     )
+    image_thumbnail = models.ImageField(
+        upload_to='recipes/thumbnails',
+        blank=True,
+        verbose_name='Миниатюра'
+    )
+    image_webp = models.ImageField(
+        upload_to='recipes/webp',
+        blank=True,
+        verbose_name='Изображение WebP'
+    )
     text = models.TextField(verbose_name='Текст')
     cooking_time = models.IntegerField(
         validators=[MinValueValidator(1)],
@@ -56,6 +69,10 @@ class Recipe(models.Model):
         ordering = ['id']
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [models.Index(
+            fields=['author', 'id'],
+            name='recipe_author_id_idx'
+        )]
 
     def __str__(self):
         return self.name
@@ -65,12 +82,14 @@ class IngredientRecipe(models.Model):
     ingredient = models.ForeignKey(
         Ingredient,
         models.CASCADE,
-        verbose_name='Ингредиент'
+        verbose_name='Ингредиент',
+        db_index=False
     )
     recipe = models.ForeignKey(
         Recipe,
         models.CASCADE,
-        verbose_name='Рецепт'
+        verbose_name='Рецепт',
+        db_index=False
     )
     amount = models.IntegerField(verbose_name='Количество')
 
@@ -82,6 +101,11 @@ class IngredientRecipe(models.Model):
             fields=['ingredient', 'recipe'],
             name='Unique IngredientRecipe'
         )]
+        indexes = [models.Index(
+            fields=['recipe', 'ingredient'],
+            include=['amount'],
+            name='ingredientrecipe_recipe_idx'
+        )]
 
     def __str__(self):
         return f'{self.ingredient} ({self.amount}) -> {self.recipe}'
@@ -92,13 +116,15 @@ class RecipeFollow(models.Model):
         Recipe,
         models.CASCADE,
         'is_favorite',
-        verbose_name='Рецепт'
+        verbose_name='Рецепт',
+        db_index=False
     )
     user = models.ForeignKey(
         User,
         models.CASCADE,
         'favorite',
-        verbose_name='Пользователь'
+        verbose_name='Пользователь',
+        db_index=False
     )
 
     class Meta:
@@ -109,6 +135,10 @@ class RecipeFollow(models.Model):
             fields=['recipe', 'user'],
             name='Unique RecipeFollow'
         )]
+        indexes = [models.Index(
+            fields=['user', 'recipe'],
+            name='recipefollow_user_recipe_idx'
+        )]
 
     def __str__(self):
         return f'{self.user} -> {self.recipe}'
@@ -119,7 +149,8 @@ class Cart(models.Model):
         User,
         models.CASCADE,
         'cart',
-        verbose_name='Пользователь'
+        verbose_name='Пользователь',
+        db_index=False
     )
     recipe = models.ForeignKey(
         Recipe,
@@ -0,0 +1,58 @@
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .utils import write_shopping_list_pdf
+
+
+class ShoppingListRenderer(BaseRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data)
+        return self.render_ingredients(data)
+
+    def render_ingredients(self, ingredients):
+        raise NotImplementedError
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def render_ingredients(self, ingredients):
+        buffer = io.BytesIO()
+        write_shopping_list_pdf(ingredients, buffer)
+        return buffer.getvalue()
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_ingredients(self, ingredients):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(('name', 'measurement_unit', 'amount'))
+        for ingredient in ingredients:
+            writer.writerow((
+                ingredient.get('name'),
+                ingredient.get('measurement_unit'),
+                ingredient.get('amount')
+            ))
+        return buffer.getvalue()
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render_ingredients(self, ingredients):
+        return ''.join(
+            f'{count}. {ingredient.get("name")} - {ingredient.get("amount")} '
+            f'{ingredient.get("measurement_unit")}.\n'
+            for count, ingredient in enumerate(ingredients, 1)
+        )
@@ -0,0 +1,88 @@
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from threading import Lock
+
+from core.cache import INGREDIENTS_VERSION, get_version
+from .models import Ingredient
+
+NGRAM_SIZE = 3
+
+Snapshot = namedtuple('Snapshot', ['version', 'rows', 'keys', 'postings'])
+
+
+def _ngrams(value: str) -> set:
+    return {
+        value[index:index + NGRAM_SIZE]
+        for index in range(len(value) - NGRAM_SIZE + 1)
+    }
+
+
+def _prefix_positions(snapshot: Snapshot, term: str):
+    keys = snapshot.keys
+    position = bisect_left(keys, term)
+    while position < len(keys) and keys[position].startswith(term):
+        yield position
+        position += 1
+
+
+def _substring_positions(snapshot: Snapshot, term: str):
+    ngrams = _ngrams(term)
+    if ngrams:
+        postings = sorted(
+            (snapshot.postings.get(ngram, ()) for ngram in ngrams), key=len
+        )
+        candidates = sorted(set(postings[0]).intersection(*postings[1:]))
+    else:
+        candidates = range(len(snapshot.keys))
+    for position in candidates:
+        key = snapshot.keys[position]
+        if term in key and not key.startswith(term):
+            yield position
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _build(self, version) -> Snapshot:
+        rows = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda row: row['name'].casefold()
+        )
+        keys = [row['name'].casefold() for row in rows]
+        postings = defaultdict(list)
+        for position, key in enumerate(keys):
+            for ngram in _ngrams(key):
+                postings[ngram].append(position)
+        return Snapshot(version, rows, keys, dict(postings))
+
+    def _get_snapshot(self) -> Snapshot:
+        version = get_version(INGREDIENTS_VERSION)
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._snapshot = self._build(version)
+        return snapshot
+
+    def search(self, value: str, limit: int) -> list:
+        snapshot = self._get_snapshot()
+        term = value.casefold()
+        found = []
+        for positions in (
+            _prefix_positions(snapshot, term),
+            _substring_positions(snapshot, term)
+        ):
+            for position in positions:
+                if len(found) == limit:
+                    return found
+                found.append(snapshot.rows[position])
+        return found
+
+
+ingredient_index = IngredientIndex()
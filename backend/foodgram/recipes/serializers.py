@@ -10,8 +10,9 @@ from tags.serializers import TagSerializer
 from users.models import User
 from users.serializers import READ_ONLY_USER_FIELDS, CustomUserSerializer
 from .fields import Base64ImageField
+from .images import delete_image_files, schedule_image_variants
 from .models import Cart, Ingredient, IngredientRecipe, Recipe, RecipeFollow
-from .utils import add_ingredients
+from .utils import add_ingredients, get_recipes_queryset, update_ingredients
 
 RECIPE_FIELDS = (
     'id',
@@ -26,6 +27,7 @@ RECIPE_FIELDS = (
     'is_in_shopping_cart'
 )
 RECIPE_CREATE_CUTOFF_INDEX = -2
+RECIPE_IMAGE_VARIANT_FIELDS = ('image_thumbnail', 'image_webp')
 
 
 class IngredientsSerializer(ModelSerializer):
@@ -55,9 +57,16 @@ class ReadOnlyRecipeSerializer(ModelSerializer):
 
     class Meta:
         model = Recipe
-        fields = RECIPE_FIELDS
+        fields = RECIPE_FIELDS + RECIPE_IMAGE_VARIANT_FIELDS
+
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
 
         if user.is_anonymous:
@@ -68,6 +77,8 @@ class ReadOnlyRecipeSerializer(ModelSerializer):
         ).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
 
         if user.is_anonymous:
@@ -81,7 +92,9 @@ class ReadOnlyRecipeSerializer(ModelSerializer):
 class ShortRecipeSerializer(ModelSerializer):
     class Meta:
         model = Recipe
-        fields = ['id', 'name', 'image', 'cooking_time']
+        fields = [
+            'id', 'name', 'image', 'cooking_time', *RECIPE_IMAGE_VARIANT_FIELDS
+        ]
 
 
 class CreateRecipeSerializer(ModelSerializer):
@@ -95,46 +108,90 @@ class CreateRecipeSerializer(ModelSerializer):
         fields = RECIPE_FIELDS[:RECIPE_CREATE_CUTOFF_INDEX]
 
     def validate_ingredients(self, ingredients_data):
-        ingredients_ids = set()
+        errors = []
+        amounts = {}
 
         for ingredient in ingredients_data:
-            keys = ingredient.keys()
-            if 'id' not in keys or 'amount' not in keys:
-                raise ValidationError('Invalid ingredient data')
-
-            ingredient_id = ingredient.get('id')
-            if ingredient.get('id') in ingredients_ids:
-                raise ValidationError(
-                    f'Duplicate ingredient ID: {ingredient_id}')
-            ingredients_ids.add(ingredient_id)
-
-            if not Ingredient.objects.filter(id=ingredient_id).exists():
-                raise ValidationError('No such ingredient')
-            if int(ingredient.get('amount')) < 1:
-                raise ValidationError('Amount must be greater or equal 1')
-
-        return ingredients_data
+            try:
+                ingredient_id = int(ingredient['id'])
+                amount = int(ingredient['amount'])
+            except (KeyError, TypeError, ValueError):
+                errors.append('Invalid ingredient data')
+                continue
+            if ingredient_id in amounts:
+                errors.append(f'Duplicate ingredient ID: {ingredient_id}')
+            if amount < 1:
+                errors.append('Amount must be greater or equal 1')
+            amounts[ingredient_id] = amount
+
+        ingredients = Ingredient.objects.in_bulk(amounts)
+        missing = [str(pk) for pk in amounts if pk not in ingredients]
+        if missing:
+            errors.append(f'No such ingredient: {", ".join(missing)}')
+        if errors:
+            raise ValidationError(errors)
+
+        return [
+            {'id': pk, 'ingredient': ingredients[pk], 'amount': amount}
+            for pk, amount in amounts.items()
+        ]
+
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        finally:
+            image = self.validated_data.get('image')
+            if image is not None:
+                image.close()
 
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags_data)
+        schedule_image_variants(recipe)
         return add_ingredients(ingredients_data, recipe)
 
     def update(self, instance, validated_data):
-        instance.tags.set(validated_data.get('tags'))
+        ingredients_data = validated_data.pop('ingredients', None)
+        tags_data = validated_data.pop('tags', None)
+        old_files = []
+        if 'image' in validated_data:
+            old_files = [
+                getattr(instance, field).name
+                for field in ('image', *RECIPE_IMAGE_VARIANT_FIELDS)
+            ]
+            validated_data.update(image_thumbnail='', image_webp='')
+        changed = self.__changed_fields(instance, validated_data)
         with atomic():
-            instance.ingredientrecipe_set.all().delete()
-            return add_ingredients(
-                validated_data.get('ingredients'),
-                instance
-            )
+            if changed:
+                for field in changed:
+                    setattr(instance, field, validated_data[field])
+                instance.save(update_fields=changed)
+            if 'image' in changed:
+                schedule_image_variants(instance)
+                delete_image_files(old_files)
+            if tags_data is not None:
+                instance.tags.set(tags_data)
+            if ingredients_data is not None:
+                update_ingredients(ingredients_data, instance)
+        return instance
+
+    def __changed_fields(self, instance, validated_data):
+        changed = []
+        for name, value in validated_data.items():
+            field = instance._meta.get_field(name)
+            if field.is_relation:
+                value = value.pk
+            if getattr(instance, field.attname) != value:
+                changed.append(name)
+        return changed
 
     def to_representation(self, instance):
+        request = self.context.get('request')
         return ReadOnlyRecipeSerializer(
-            instance,
-            context={'request': self.context.get('request')}
+            get_recipes_queryset(request.user).get(pk=instance.pk),
+            context={'request': request}
         ).data
 
 
@@ -147,16 +204,13 @@ class CustomUserSerializerWithRecipes(CustomUserSerializer):
         fields = READ_ONLY_USER_FIELDS
 
     def get_recipes(self, obj):
+        recipes = obj.recipes.all()
         limit = self.context.get('request').GET.get('recipes_limit')
         if limit:
-            return ShortRecipeSerializer(
-                Recipe.objects.filter(author=obj)[:int(limit)],
-                many=True
-            ).data
-        return ShortRecipeSerializer(
-            Recipe.objects.filter(author=obj),
-            many=True
-        ).data
+            recipes = recipes[:int(limit)]
+        return ShortRecipeSerializer(recipes, many=True).data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+        return obj.recipes.count()
@@ -0,0 +1,89 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.cache import (CART_VERSION, FAVORITES_VERSION, FOLLOWS_VERSION,
+                        INGREDIENTS_VERSION, RECIPES_VERSION, TAGS_VERSION,
+                        bump_version_on_commit)
+from tags.models import Tag
+from users.models import User, UserFollow
+from .models import Cart, Ingredient, IngredientRecipe, Recipe, RecipeFollow
+from .search import ingredient_index
+from .utils import invalidate_recipe_carts
+
+AUTHOR_FIELDS = ('username', 'first_name', 'last_name', 'email')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipes(**kwargs):
+    bump_version_on_commit(RECIPES_VERSION)
+
+
+@receiver(post_save, sender=IngredientRecipe)
+@receiver(post_delete, sender=IngredientRecipe)
+def invalidate_ingredient_recipe_carts(instance, **kwargs):
+    invalidate_recipe_carts(instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    ingredient_index.invalidate()
+    bump_version_on_commit(INGREDIENTS_VERSION, RECIPES_VERSION)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(**kwargs):
+    bump_version_on_commit(TAGS_VERSION, RECIPES_VERSION)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_fields(instance, update_fields=None, **kwargs):
+    if instance.pk is None or update_fields is not None:
+        return
+    instance.saved_author_fields = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*AUTHOR_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_recipe_authors(instance, created, update_fields=None,
+                              **kwargs):
+    if created:
+        return
+    if update_fields is not None:
+        if not set(AUTHOR_FIELDS).intersection(update_fields):
+            return
+    elif getattr(instance, 'saved_author_fields', None) == tuple(
+        getattr(instance, field) for field in AUTHOR_FIELDS
+    ):
+        return
+    bump_version_on_commit(RECIPES_VERSION)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_author(**kwargs):
+    bump_version_on_commit(RECIPES_VERSION)
+
+
+@receiver(post_save, sender=RecipeFollow)
+@receiver(post_delete, sender=RecipeFollow)
+def invalidate_favorites(instance, **kwargs):
+    bump_version_on_commit(FAVORITES_VERSION.format(instance.user_id))
+
+
+@receiver(post_save, sender=Cart)
+@receiver(post_delete, sender=Cart)
+def invalidate_cart(instance, **kwargs):
+    bump_version_on_commit(CART_VERSION.format(instance.user_id))
+
+
+@receiver(post_save, sender=UserFollow)
+@receiver(post_delete, sender=UserFollow)
+def invalidate_follows(instance, **kwargs):
+    bump_version_on_commit(FOLLOWS_VERSION.format(instance.user_id))
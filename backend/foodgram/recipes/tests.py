@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from tags.models import Tag
+from users.models import User
+from .models import Cart, Ingredient, IngredientRecipe, Recipe, RecipeFollow
+
+RECIPES_COUNT = 200
+RECIPE_LIST_QUERIES = 4
+
+
+class RecipeListQueriesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader',
+            email='reader@example.com',
+            password='password',
+            first_name='Reader',
+            last_name='Reader'
+        )
+        authors = [
+            User.objects.create(
+                username=f'author{index}',
+                email=f'author{index}@example.com',
+                first_name='Author',
+                last_name='Author'
+            )
+            for index in range(10)
+        ]
+        tags = [
+            Tag.objects.create(
+                name=f'tag{index}', color=f'#00000{index}', slug=f'tag{index}'
+            )
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'ingredient{index}', measurement_unit='g'
+            )
+            for index in range(10)
+        ]
+        recipes = [
+            Recipe.objects.create(
+                author=authors[index % len(authors)],
+                name=f'recipe{index}',
+                image='recipes/images/recipe.png',
+                text='text',
+                cooking_time=10
+            )
+            for index in range(RECIPES_COUNT)
+        ]
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes for tag in tags[:recipe.pk % 3 + 1]
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=recipe,
+                ingredient=ingredients[(recipe.pk + offset) % 10],
+                amount=offset + 1
+            )
+            for recipe in recipes for offset in range(3)
+        )
+        RecipeFollow.objects.bulk_create(
+            RecipeFollow(user=cls.user, recipe=recipe)
+            for recipe in recipes[::2]
+        )
+        Cart.objects.bulk_create(
+            Cart(user=cls.user, recipe=recipe) for recipe in recipes[::3]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for limit in (6, 50, 200):
+            with self.subTest(limit=limit):
+                cache.clear()
+                with self.assertNumQueries(RECIPE_LIST_QUERIES):
+                    response = self.client.get(
+                        '/api/recipes/', {'limit': limit}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), limit)
@@ -1,4 +1,151 @@
-from .models import IngredientRecipe, Recipe
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (BooleanField, Count, Exists, F, OuterRef,
+                              Prefetch, QuerySet, Subquery, Sum, Value)
+from django.db.transaction import on_commit
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+
+from core.cache import (CART_VERSION, INGREDIENTS_VERSION, RECIPES_VERSION,
+                        TAGS_VERSION, bump_version_on_commit, get_version,
+                        get_versions, make_cache_key)
+from core.routers import primary_reads
+from tags.models import Tag
+from users.models import User, UserFollow
+from .models import Cart, IngredientRecipe, Recipe, RecipeFollow
+
+PDF_FONT = 'pacifico'
+PDF_TITLE_Y = 800
+PDF_FIRST_LINE_Y = 740
+PDF_BOTTOM_MARGIN = 50
+PDF_LINE_X = 75
+PDF_LINE_HEIGHT = 38
+TAG_IDS_CACHE_TIMEOUT = 60 * 60 * 24
+
+pending_cart_recipes = threading.local()
+
+
+def register_pdf_font() -> None:
+    pdfmetrics.registerFont(
+        TTFont(PDF_FONT, settings.BASE_DIR / 'Pacifico.ttf')
+    )
+
+
+def write_shopping_list_pdf(ingredients, file) -> None:
+    page = Canvas(file)
+    page.setFont(PDF_FONT, size=24)
+    page.drawString(190, PDF_TITLE_Y, 'Список ингредиентов')
+    page.setFont(PDF_FONT, size=21)
+    y_axis = PDF_FIRST_LINE_Y
+    for count, ingredient in enumerate(ingredients, 1):
+        if y_axis < PDF_BOTTOM_MARGIN:
+            page.showPage()
+            page.setFont(PDF_FONT, size=21)
+            y_axis = PDF_TITLE_Y
+        page.drawString(
+            PDF_LINE_X,
+            y_axis,
+            f'{count}. {ingredient.get("name")} - {ingredient.get("amount")} '
+            f'{ingredient.get("measurement_unit")}.'
+        )
+        y_axis -= PDF_LINE_HEIGHT
+    page.showPage()
+    page.save()
+
+
+def _invalidate_pending_carts() -> None:
+    recipe_ids = getattr(pending_cart_recipes, 'ids', None)
+    if not recipe_ids:
+        return
+    pending_cart_recipes.ids = set()
+    bump_version_on_commit(*(
+        CART_VERSION.format(user_id)
+        for user_id in Cart.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by().values_list('user_id', flat=True).distinct()
+    ))
+
+
+def invalidate_recipe_carts(recipe_id: int) -> None:
+    # Rows of one recipe change together, so collect the recipes and look
+    # up their carts once when the transaction commits.
+    if not hasattr(pending_cart_recipes, 'ids'):
+        pending_cart_recipes.ids = set()
+    pending_cart_recipes.ids.add(recipe_id)
+    on_commit(_invalidate_pending_carts)
+
+
+def get_shopping_list_key(user: User) -> str:
+    versions = get_versions(CART_VERSION.format(user.pk), INGREDIENTS_VERSION)
+    return make_cache_key('shopping_list', user.pk, sorted(versions.items()))
+
+
+def get_shopping_list(user: User, key: str) -> list:
+    ingredients = cache.get(key)
+    if ingredients is None:
+        with primary_reads():
+            ingredients = list(IngredientRecipe.objects.filter(
+                recipe__cart__user=user
+            ).order_by('ingredient__name').values(
+                name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit')
+            ).annotate(amount=Sum('amount')))
+        cache.set(key, ingredients, settings.SHOPPING_LIST_CACHE_TIMEOUT)
+    return ingredients
+
+
+def get_tag_ids() -> dict:
+    key = make_cache_key('tag_ids', get_version(TAGS_VERSION))
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        with primary_reads():
+            tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+        cache.set(key, tag_ids, TAG_IDS_CACHE_TIMEOUT)
+    return tag_ids
+
+
+def get_recipes_queryset(user: User) -> QuerySet:
+    queryset = Recipe.objects.select_related('author').prefetch_related(
+        'tags',
+        Prefetch(
+            'ingredientrecipe_set',
+            queryset=IngredientRecipe.objects.select_related('ingredient')
+        )
+    )
+    if user.is_anonymous:
+        return queryset.annotate(
+            is_favorited=Value(False, BooleanField()),
+            is_in_shopping_cart=Value(False, BooleanField()),
+            author_is_subscribed=Value(False, BooleanField())
+        )
+    return queryset.annotate(
+        is_favorited=Exists(RecipeFollow.objects.filter(
+            recipe=OuterRef('pk'), user=user
+        )),
+        is_in_shopping_cart=Exists(Cart.objects.filter(
+            recipe=OuterRef('pk'), user=user
+        )),
+        author_is_subscribed=Exists(UserFollow.objects.filter(
+            author=OuterRef('author'), user=user
+        ))
+    )
+
+
+def get_subscriptions_queryset(user: User, recipes_limit=None) -> QuerySet:
+    recipes = Recipe.objects.all()
+    if recipes_limit is not None:
+        recipes = recipes.filter(pk__in=Subquery(Recipe.objects.filter(
+            author=OuterRef('author')
+        ).values('pk')[:recipes_limit]))
+    return User.objects.filter(subscribers__user=user).annotate(
+        is_subscribed=Value(True, BooleanField()),
+        recipes_count=Count('recipes')
+    ).prefetch_related(
+        Prefetch('recipes', queryset=recipes)
+    ).order_by('id')
 
 
 def add_ingredients(ingredients_data: list, recipe: Recipe) -> Recipe:
@@ -7,8 +154,39 @@ def add_ingredients(ingredients_data: list, recipe: Recipe) -> Recipe:
     for ingredient_data in ingredients_data:
         ingredients_list.append(IngredientRecipe(
             recipe=recipe,
-            ingredient_id=ingredient_data.get('id'),
+            ingredient=ingredient_data.get('ingredient'),
             amount=ingredient_data.get('amount')
         ))
     IngredientRecipe.objects.bulk_create(ingredients_list)
     return recipe
+
+
+def update_ingredients(ingredients_data: list, recipe: Recipe) -> Recipe:
+    current = {
+        ingredient_recipe.ingredient_id: ingredient_recipe
+        for ingredient_recipe in recipe.ingredientrecipe_set.all()
+    }
+    to_create, to_update = [], []
+
+    for ingredient_data in ingredients_data:
+        ingredient_recipe = current.pop(ingredient_data.get('id'), None)
+        if ingredient_recipe is None:
+            to_create.append(IngredientRecipe(
+                recipe=recipe,
+                ingredient=ingredient_data.get('ingredient'),
+                amount=ingredient_data.get('amount')
+            ))
+        elif ingredient_recipe.amount != ingredient_data.get('amount'):
+            ingredient_recipe.amount = ingredient_data.get('amount')
+            to_update.append(ingredient_recipe)
+    if not (to_create or to_update or current):
+        return recipe
+
+    IngredientRecipe.objects.bulk_create(to_create)
+    IngredientRecipe.objects.bulk_update(to_update, ['amount'])
+    IngredientRecipe.objects.filter(
+        pk__in=[ingredient_recipe.pk for ingredient_recipe in current.values()]
+    ).delete()
+    bump_version_on_commit(RECIPES_VERSION)
+    invalidate_recipe_carts(recipe.pk)
+    return recipe
@@ -1,40 +1,82 @@
-from django.db.models import Sum
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db.transaction import atomic
-from django.http import HttpResponse
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen.canvas import Canvas
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.renderers import JSONRenderer
 from rest_framework.request import HttpRequest as Request
 from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                                    HTTP_400_BAD_REQUEST)
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from core.cache import (CART_VERSION, FAVORITES_VERSION, FOLLOWS_VERSION,
+                        INGREDIENTS_VERSION, RECIPES_VERSION)
+from core.mixins import ConditionalGetMixin, SerializationTimingMixin
 from core.permissions import IsAuthor
 from .filters import IngredientFilter, RecipeFilters
-from .models import Cart, Ingredient, IngredientRecipe, Recipe, RecipeFollow
+from .models import Cart, Ingredient, Recipe, RecipeFollow
+from .renderers import (ShoppingListCSVRenderer, ShoppingListPDFRenderer,
+                        ShoppingListTextRenderer)
+from .search import ingredient_index
 from .serializers import (CreateRecipeSerializer, IngredientsSerializer,
                           ReadOnlyRecipeSerializer, ShortRecipeSerializer)
+from .utils import (get_recipes_queryset, get_shopping_list,
+                    get_shopping_list_key, write_shopping_list_pdf)
+
+PDF_SPOOL_MAX_SIZE = 1024 * 1024
+PDF_CACHE_MAX_SIZE = 256 * 1024
 
 
-class IngredientsViewSet(ReadOnlyModelViewSet):
+class IngredientsViewSet(ConditionalGetMixin, SerializationTimingMixin,
+                         ReadOnlyModelViewSet):
+    cache_versions = [INGREDIENTS_VERSION]
     queryset = Ingredient.objects.all()
     serializer_class = IngredientsSerializer
     pagination_class = None
     filterset_class = IngredientFilter
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def filter_queryset(self, queryset):
+        name = self.request.query_params.get('name')
+        if self.action != 'list' or not name:
+            return super().filter_queryset(queryset)
+        if settings.INGREDIENT_SEARCH_INDEX:
+            return ingredient_index.search(
+                name, settings.INGREDIENT_SEARCH_LIMIT
+            )
+        return super().filter_queryset(
+            queryset
+        )[:settings.INGREDIENT_SEARCH_LIMIT]
 
-class RecipesViewSet(ModelViewSet):
-    queryset = Recipe.objects.all()
+
+class RecipesViewSet(ConditionalGetMixin, SerializationTimingMixin,
+                     ModelViewSet):
     filterset_class = RecipeFilters
     permission_classes = [IsAuthenticatedOrReadOnly]
     http_method_names = ['get', 'post', 'head', 'delete', 'patch']
+    anonymous_cache_timeout = settings.RECIPES_CACHE_TIMEOUT
+
+    def get_queryset(self):
+        return get_recipes_queryset(self.request.user)
+
+    def get_cache_versions(self):
+        user = self.request.user
+        if user.is_anonymous:
+            return [RECIPES_VERSION]
+        return [
+            RECIPES_VERSION,
+            FAVORITES_VERSION.format(user.pk),
+            CART_VERSION.format(user.pk),
+            FOLLOWS_VERSION.format(user.pk)
+        ]
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -97,44 +139,42 @@ class RecipesViewSet(ModelViewSet):
             'put to cart'
         )
 
-    @action(methods=['GET'], detail=False,
-            permission_classes=[IsAuthenticated])
+    @action(
+        methods=['GET'],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[
+            ShoppingListPDFRenderer,
+            ShoppingListCSVRenderer,
+            ShoppingListTextRenderer,
+            JSONRenderer
+        ]
+    )
     def download_shopping_cart(self, request):
-        ingredients_total = {}
-        ingredients = IngredientRecipe.objects.filter(
-            recipe__cart__user=request.user
-        ).order_by('ingredient__name').values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(total_amount=Sum('amount'))
-
-        for ingredient in ingredients:
-            ingredients_total[ingredient.get('ingredient__name')] = {
-                'measurement_unit': ingredient.get(
-                    'ingredient__measurement_unit'
-                ),
-                'amount': ingredient.get('total_amount')
-            }
-
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = ('attachment;'
-                                           ' filename="shopping_cart.pdf"')
-        pdfmetrics.registerFont(TTFont('pacifico', 'Pacifico.ttf', 'UTF-8'))
-        page = Canvas(response)
-        page.setFont('pacifico', size=24)
-        page.drawString(190, 800, 'Список ингредиентов')
-        page.setFont('pacifico', size=21)
-        y_axis = 740
-        x_axis = 75
-        for count, (name, data) in enumerate(ingredients_total.items(), 1):
-            page.drawString(
-                x_axis,
-                y_axis,
-                f'{count}. {name} - {data.get("amount")} '
-                f'{data.get("measurement_unit")}.'
-            )
-            y_axis -= 38
+        key = get_shopping_list_key(request.user)
+        export_format = request.accepted_renderer.format
+        filename = f'shopping_cart.{export_format}'
 
-        page.showPage()
-        page.save()
-        return response
+        if export_format != ShoppingListPDFRenderer.format:
+            return Response(get_shopping_list(request.user, key), headers={
+                'Content-Disposition': f'attachment; filename="{filename}"'
+            })
+        pdf_key = f'{key}:pdf'
+        content = cache.get(pdf_key)
+        if content is not None:
+            file = BytesIO(content)
+        else:
+            file = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+            write_shopping_list_pdf(get_shopping_list(request.user, key), file)
+            if file.tell() <= PDF_CACHE_MAX_SIZE:
+                file.seek(0)
+                cache.set(
+                    pdf_key, file.read(), settings.SHOPPING_LIST_CACHE_TIMEOUT
+                )
+            file.seek(0)
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=filename,
+            content_type=ShoppingListPDFRenderer.media_type
+        )
@@ -14,7 +14,7 @@ class Tag(Model):
         validators=[hex_color_validate],
         verbose_name='Цвет'
     )
-    slug = SlugField(max_length=200, verbose_name='Слаг')
+    slug = SlugField(max_length=200, unique=True, verbose_name='Слаг')
 
     class Meta:
         ordering = ['id']
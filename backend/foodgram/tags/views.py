@@ -1,11 +1,15 @@
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from core.cache import TAGS_VERSION
+from core.mixins import ConditionalGetMixin, SerializationTimingMixin
 from .models import Tag
 from .serializers import TagSerializer
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(ConditionalGetMixin, SerializationTimingMixin,
+                 ReadOnlyModelViewSet):
+    cache_versions = [TAGS_VERSION]
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.18 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_auto_20230515_1948'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userfollow',
+            index=models.Index(fields=['user', 'author'], name='userfollow_user_author_idx'),
+        ),
+    ]
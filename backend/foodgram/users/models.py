@@ -44,13 +44,15 @@ class UserFollow(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='subscribers',
-        verbose_name='Автор'
+        verbose_name='Автор',
+        db_index=False
     )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='subscribed',
-        verbose_name='Пользователь'
+        verbose_name='Пользователь',
+        db_index=False
     )
 
     class Meta:
@@ -61,6 +63,10 @@ class UserFollow(models.Model):
             fields=['author', 'user'],
             name='Unique UserFollow'
         )]
+        indexes = [models.Index(
+            fields=['user', 'author'],
+            name='userfollow_user_author_idx'
+        )]
 
     def __str__(self):
         return f'{self.user} -> {self.author}'
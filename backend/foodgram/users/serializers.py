@@ -34,6 +34,8 @@ class CustomUserSerializer(UserSerializer):
         fields = READ_ONLY_USER_FIELDS[:COMMON_FIELDS_END_INDEX]
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         current_user = self.context.get('request').user
         if current_user.is_anonymous or current_user == obj:
             return False
@@ -6,8 +6,10 @@ from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                                    HTTP_400_BAD_REQUEST)
 
+from core.metrics import serialize
 from .models import User, UserFollow
 from recipes.serializers import CustomUserSerializerWithRecipes
+from recipes.utils import get_subscriptions_queryset
 
 
 class UserFollowsViewSet(UserViewSet):
@@ -43,12 +45,15 @@ class UserFollowsViewSet(UserViewSet):
 
     @action(methods=['GET'], detail=False)
     def subscriptions(self, request):
-        return self.get_paginated_response(
+        recipes_limit = request.GET.get('recipes_limit')
+        return self.get_paginated_response(serialize(
+            request,
             CustomUserSerializerWithRecipes(
-                self.paginate_queryset(
-                    User.objects.filter(subscribers__user=request.user)
-                ),
+                self.paginate_queryset(get_subscriptions_queryset(
+                    request.user,
+                    int(recipes_limit) if recipes_limit else None
+                )),
                 many=True,
                 context={'request': request}
-            ).data
-        )
+            )
+        ))